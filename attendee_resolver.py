@@ -0,0 +1,218 @@
+"""
+Attendee display-name resolution with a bounded LRU + TTL cache
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of locks that serialize backend lookups for the same address
+_LOOKUP_LOCK_STRIPES = 64
+
+class DirectoryBackend(ABC):
+    """Base class for looking up a display name by email address"""
+
+    @abstractmethod
+    def lookup(self, email: str) -> Optional[str]:
+        """Return the display name for an email, or None if unknown"""
+
+class StaticDirectory(DirectoryBackend):
+    """Local directory backed by a plain email -> name mapping"""
+
+    def __init__(self, names: Dict[str, str] = None):
+        """Initialize with an optional mapping of email addresses to names"""
+        self.names = {email.lower(): name for email, name in (names or {}).items()}
+        self.lookups = 0
+
+    def lookup(self, email: str) -> Optional[str]:
+        """Return the name stored for this email, if any"""
+        self.lookups += 1
+        return self.names.get(email.lower())
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 86400, persist_path: Path = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of entries kept before evicting the oldest
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            persist_path: Optional JSON file used to keep entries between runs
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+        if persist_path:
+            self.load()
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        """Store a value, evicting least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def load(self):
+        """Load unexpired entries from the persistence file"""
+        if not self.persist_path or not self.persist_path.exists():
+            return
+
+        try:
+            with open(self.persist_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file {self.persist_path}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            # Entries are saved oldest first, so insertion order is LRU order
+            for key, value, stored_at in data.get('entries', []):
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries[key] = (value, stored_at)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        logger.info(f"Loaded {len(self._entries)} cached entries from {self.persist_path}")
+
+    def save(self):
+        """Write unexpired entries to the persistence file"""
+        if not self.persist_path:
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = [
+                [key, value, stored_at]
+                for key, (value, stored_at) in self._entries.items()
+                if now - stored_at <= self.ttl_seconds
+            ]
+
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'entries': entries}, f)
+            tmp_path.replace(self.persist_path)
+        except OSError as e:
+            logger.warning(f"Could not save cache file {self.persist_path}: {e}")
+
+class AttendeeResolver:
+    """Maps attendee email addresses to display names"""
+
+    def __init__(self, backend: DirectoryBackend = None, cache: LRUTTLCache = None):
+        """
+        Initialize the resolver
+
+        Args:
+            backend: Directory consulted when the event has no displayName
+            cache: Cache shared across events and, if persisted, across runs
+        """
+        self.backend = backend
+        self.cache = cache if cache is not None else LRUTTLCache()
+        # Fetch workers share one resolver; a fixed set of locks keyed by
+        # address hash keeps two threads from looking up the same address
+        self._lookup_locks = [threading.Lock() for _ in range(_LOOKUP_LOCK_STRIPES)]
+
+    def resolve(self, attendee: Dict) -> str:
+        """
+        Return the display name for an attendee entry from an event payload.
+        Falls back to the email address when no name can be found.
+        """
+
+        email = attendee.get('email', '')
+        key = email.lower()
+
+        # Names supplied by the event itself are authoritative
+        display_name = attendee.get('displayName')
+        if display_name:
+            if key:
+                self.cache.set(key, display_name)
+            return display_name
+
+        if not key:
+            return email
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lookup_locks[hash(key) % _LOOKUP_LOCK_STRIPES]:
+            # Another thread may have resolved this address while we waited
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            name = None
+            if self.backend is not None:
+                try:
+                    name = self.backend.lookup(email)
+                except Exception as e:
+                    # Don't cache failures, so the next run can try again
+                    logger.warning(f"Directory lookup failed for {email}: {e}")
+                    return email
+
+            # Cache misses too, so each address hits the backend at most once per TTL
+            resolved = name or email
+            self.cache.set(key, resolved)
+            return resolved
+
+    def save(self):
+        """Persist the cache, if it has a persistence file"""
+        self.cache.save()
+
+    @classmethod
+    def from_config(cls, config) -> 'AttendeeResolver':
+        """
+        Build a resolver with the persisted cache settings from Config.
+        If ATTENDEE_DIRECTORY_FILE is set, its JSON object of email -> name
+        is used as the directory backend; otherwise only displayName is used.
+        """
+        backend = None
+        if config.ATTENDEE_DIRECTORY_FILE:
+            try:
+                with open(config.ATTENDEE_DIRECTORY_FILE, 'r') as f:
+                    backend = StaticDirectory(json.load(f))
+            except (OSError, ValueError, AttributeError) as e:
+                raise ValueError(f"Invalid ATTENDEE_DIRECTORY_FILE {config.ATTENDEE_DIRECTORY_FILE}: {e}")
+
+        return cls(
+            backend=backend,
+            cache=LRUTTLCache(
+                max_size=config.ATTENDEE_CACHE_SIZE,
+                ttl_seconds=config.ATTENDEE_CACHE_TTL,
+                persist_path=config.ATTENDEE_CACHE_FILE
+            )
+        )
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark the digest pipeline against the sequential path
+
+Uses fake Calendar and SMTP services that sleep to simulate network
+latency, so it runs without credentials. Rendering uses the real
+email template.
+"""
+
+import argparse
+import time
+
+from email_template import generate_calendar_email
+from pipeline import DigestPipeline, run_sequential
+
+def make_fake_services(fetch_latency: float, send_latency: float, events_per_calendar: int):
+    """Return fetch, render and send functions backed by fake services"""
+
+    def fetch(job):
+        time.sleep(fetch_latency)
+        return [
+            {
+                'title': f"Meeting {i} on {job['calendar_id']}",
+                'date': "Today",
+                'time': "10:00 AM - 11:00 AM",
+                'location': "Conference Room",
+                'attendees': ["Alice", "Bob", "Carol", "Dave"],
+                'meeting_link': '',
+                'is_all_day': False,
+            }
+            for i in range(events_per_calendar)
+        ]
+
+    def render(job, events):
+        return generate_calendar_email(events=events, recipient_name="Noah")
+
+    def send(job, content):
+        time.sleep(send_latency)
+        return True
+
+    return fetch, render, send
+
+def main():
+    """Run both paths over the same jobs and print throughput"""
+
+    parser = argparse.ArgumentParser(description="Benchmark pipelined vs sequential digests")
+    parser.add_argument('--jobs', type=int, default=40, help="Calendar/recipient pairs (default: 40)")
+    parser.add_argument('--fetch-latency', type=float, default=0.15, help="Simulated Calendar API seconds (default: 0.15)")
+    parser.add_argument('--send-latency', type=float, default=0.10, help="Simulated SMTP seconds (default: 0.10)")
+    parser.add_argument('--events', type=int, default=10, help="Events per calendar (default: 10)")
+    parser.add_argument('--fetch-workers', type=int, default=4)
+    parser.add_argument('--render-workers', type=int, default=2)
+    parser.add_argument('--send-workers', type=int, default=2)
+    args = parser.parse_args()
+
+    jobs = [
+        {'calendar_id': f"calendar-{i}", 'recipient': f"user{i}@example.com"}
+        for i in range(args.jobs)
+    ]
+    fetch, render, send = make_fake_services(args.fetch_latency, args.send_latency, args.events)
+
+    sequential = run_sequential(jobs, fetch, render, send)
+    pipelined = DigestPipeline(
+        fetch, render, send,
+        fetch_workers=args.fetch_workers,
+        render_workers=args.render_workers,
+        send_workers=args.send_workers
+    ).run(jobs)
+
+    print(f"{'path':<12}{'sent':>6}{'errors':>8}{'seconds':>10}{'jobs/s':>10}")
+    for name, result in (('sequential', sequential), ('pipelined', pipelined)):
+        elapsed = result['elapsed_seconds']
+        print(f"{name:<12}{result['sent']:>6}{len(result['errors']):>8}"
+              f"{elapsed:>10.2f}{result['jobs'] / elapsed:>10.1f}")
+    print(f"speedup: {sequential['elapsed_seconds'] / pipelined['elapsed_seconds']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -12,47 +12,63 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 
+from attendee_resolver import AttendeeResolver
+from rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
+def build_calendar_service(token_path: Path):
+    """
+    Build an authenticated Calendar API service from a saved OAuth token.
+    Refreshes and re-saves the token if it has expired.
+    """
+
+    if not token_path.exists():
+        raise FileNotFoundError(
+            f"Token not found at {token_path}. Run setup_auth.py first."
+        )
+
+    # Load credentials from token
+    creds = Credentials.from_authorized_user_file(str(token_path))
+
+    # Refresh if expired
+    if creds.expired and creds.refresh_token:
+        logger.info("Refreshing expired credentials")
+        creds.refresh(Request())
+
+        # Save refreshed token
+        with open(token_path, 'w') as token:
+            token.write(creds.to_json())
+
+    # Build calendar service
+    service = build('calendar', 'v3', credentials=creds)
+    logger.info("Calendar service authenticated successfully")
+
+    return service
+
 class CalendarClient:
     """Client for accessing Google Calendar"""
 
-    def __init__(self, credentials_path: Path, token_path: Path, calendar_id: str = 'primary', timezone: str = 'America/New_York'):
+    def __init__(self, credentials_path: Path, token_path: Path, calendar_id: str = 'primary', timezone: str = 'America/New_York',
+                 attendee_resolver: AttendeeResolver = None, rate_limiter: RateLimiter = None):
         """Initialize calendar client with OAuth credentials"""
         self.timezone = pytz.timezone(timezone)
         self.calendar_id = calendar_id
+        self.attendee_resolver = attendee_resolver or AttendeeResolver()
+        self.rate_limiter = rate_limiter
         self.service = self._authenticate(credentials_path, token_path)
 
     def _authenticate(self, credentials_path: Path, token_path: Path):
         """Authenticate and return calendar service"""
+        return build_calendar_service(token_path)
 
-        if not token_path.exists():
-            raise FileNotFoundError(
-                f"Token not found at {token_path}. Run setup_auth.py first."
-            )
-
-        # Load credentials from token
-        creds = Credentials.from_authorized_user_file(str(token_path))
-
-        # Refresh if expired
-        if creds.expired and creds.refresh_token:
-            logger.info("Refreshing expired credentials")
-            creds.refresh(Request())
-
-            # Save refreshed token
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
-
-        # Build calendar service
-        service = build('calendar', 'v3', credentials=creds)
-        logger.info("Calendar service authenticated successfully")
-
-        return service
-
-    def get_events_next_48h(self) -> List[Dict]:
+    def get_events_next_48h(self, calendar_id: str = None) -> List[Dict]:
         """
         Fetch all events from now until 48 hours from now.
         Returns list of formatted events ready for email display.
+
+        Args:
+            calendar_id: Calendar to read instead of the client's default (optional)
         """
 
         # Calculate time range
@@ -63,8 +79,9 @@ class CalendarClient:
 
         try:
             # Call Google Calendar API
+            self._throttle()
             events_result = self.service.events().list(
-                calendarId=self.calendar_id,
+                calendarId=calendar_id or self.calendar_id,
                 timeMin=now.isoformat(),
                 timeMax=end_time.isoformat(),
                 singleEvents=True,
@@ -83,6 +100,59 @@ class CalendarClient:
             logger.error(f"Error fetching calendar events: {e}")
             raise
 
+    def watch_events(self, address: str, channel_id: str, token: str = None,
+                     ttl_seconds: int = None, calendar_id: str = None) -> Dict:
+        """
+        Open an events.watch push-notification channel for a calendar.
+
+        Args:
+            address: HTTPS URL that receives the notifications
+            channel_id: Unique ID for the new channel
+            token: Secret echoed back in X-Goog-Channel-Token (optional)
+            ttl_seconds: Requested channel lifetime (optional, Google caps it)
+            calendar_id: Calendar to watch instead of the client's default (optional)
+
+        Returns:
+            Channel resource with 'id', 'resourceId' and 'expiration' (ms since epoch)
+        """
+
+        body = {
+            'id': channel_id,
+            'type': 'web_hook',
+            'address': address,
+        }
+        if token:
+            body['token'] = token
+        if ttl_seconds:
+            body['params'] = {'ttl': str(ttl_seconds)}
+
+        calendar_id = calendar_id or self.calendar_id
+        logger.info(f"Opening watch channel {channel_id} for {calendar_id}")
+
+        try:
+            self._throttle()
+            return self.service.events().watch(calendarId=calendar_id, body=body).execute()
+        except Exception as e:
+            logger.error(f"Error opening watch channel for {calendar_id}: {e}")
+            raise
+
+    def stop_channel(self, channel_id: str, resource_id: str):
+        """Stop a push-notification channel opened by watch_events"""
+
+        logger.info(f"Stopping watch channel {channel_id}")
+
+        try:
+            self._throttle()
+            self.service.channels().stop(body={'id': channel_id, 'resourceId': resource_id}).execute()
+        except Exception as e:
+            logger.error(f"Error stopping watch channel {channel_id}: {e}")
+            raise
+
+    def _throttle(self):
+        """Wait for the shared Calendar API rate limit, if one is configured"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire('calendar')
+
     def _format_event(self, event: Dict) -> Dict:
         """Convert Google Calendar event to email-friendly format"""
 
@@ -114,7 +184,7 @@ class CalendarClient:
 
         # Get attendees
         attendees = event.get('attendees', [])
-        attendee_names = [a.get('email', '') for a in attendees if not a.get('self', False)]
+        attendee_names = [self.attendee_resolver.resolve(a) for a in attendees if not a.get('self', False)]
 
         # Get meeting link (Google Meet, Zoom, etc.)
         meeting_link = ''
@@ -136,6 +206,8 @@ class CalendarClient:
                     meeting_link = urls[0]
 
         return {
+            'id': event.get('id'),
+            'etag': event.get('etag'),
             'title': title,
             'date': date_str,
             'time': time_str,
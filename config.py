@@ -4,6 +4,26 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+class _EnvNumber:
+    """
+    Numeric setting read from the environment when accessed, so a bad
+    value raises ValueError inside main's error handling instead of at import
+    """
+
+    def __init__(self, kind, default):
+        self.kind = kind
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        raw = os.getenv(self.name) or str(self.default)
+        try:
+            return self.kind(raw)
+        except ValueError:
+            raise ValueError(f"{self.name} must be a number, got {raw!r}")
+
 class Config:
     """Configuration from environment variables"""
 
@@ -11,6 +31,7 @@ class Config:
     BASE_DIR = Path(__file__).parent
     CREDENTIALS_DIR = BASE_DIR / 'credentials'
     LOG_DIR = BASE_DIR / 'logs'
+    CACHE_DIR = BASE_DIR / 'cache'
 
     # Google OAuth
     GOOGLE_CREDENTIALS = CREDENTIALS_DIR / 'credentials.json'
@@ -22,6 +43,41 @@ class Config:
     SMTP_USER = os.getenv('SMTP_USER', 'contact@xshift.ai')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
     RECIPIENT_EMAIL = os.getenv('RECIPIENT_EMAIL', 'nmarbach@gmail.com')
+    RECIPIENT_NAME = os.getenv('RECIPIENT_NAME', 'Noah')
+
+    # Extra digests as "calendar_id=recipient" or "calendar_id=recipient:Name"
+    # entries separated by commas. Without a name the greeting is just "Hi,".
+    # Defaults to a single digest of CALENDAR_ID sent to RECIPIENT_EMAIL.
+    DIGEST_JOBS = os.getenv('DIGEST_JOBS', '')
+
+    # Pipeline worker counts
+    FETCH_WORKERS = _EnvNumber(int, 4)
+    RENDER_WORKERS = _EnvNumber(int, 2)
+    SEND_WORKERS = _EnvNumber(int, 2)
+
+    # Attendee name cache
+    ATTENDEE_CACHE_FILE = CACHE_DIR / 'attendee_names.json'
+    ATTENDEE_CACHE_SIZE = _EnvNumber(int, 1024)
+    ATTENDEE_CACHE_TTL = _EnvNumber(int, 86400)
+    # Optional JSON file mapping attendee email -> display name, consulted
+    # when an event has no displayName
+    ATTENDEE_DIRECTORY_FILE = os.getenv('ATTENDEE_DIRECTORY_FILE', '')
+
+    # Rate limits shared by the Calendar API and SMTP clients
+    CALENDAR_REQUESTS_PER_SECOND = _EnvNumber(float, 5)
+    CALENDAR_BURST = _EnvNumber(int, 10)
+    SMTP_SENDS_PER_MINUTE = _EnvNumber(int, 20)
+    SMTP_SENDS_PER_DAY = _EnvNumber(int, 2000)
+    # Bucket state is kept here so limits (notably the daily SMTP limit) hold
+    # across runs and between processes
+    RATE_LIMIT_STATE_DIR = os.getenv('RATE_LIMIT_STATE_DIR') or str(CACHE_DIR / 'rate_limits')
+
+    # Push notifications (watch_receiver.py)
+    WEBHOOK_ADDRESS = os.getenv('WEBHOOK_ADDRESS', '')
+    WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+    WEBHOOK_PORT = _EnvNumber(int, 8080)
+    WEBHOOK_DEBOUNCE_SECONDS = _EnvNumber(float, 30)
+    WATCH_CHANNEL_TTL = _EnvNumber(int, 7 * 86400)
 
     # Logging
     LOG_FILE = LOG_DIR / 'daily_calendar_email.log'
@@ -30,9 +86,41 @@ class Config:
     # Timezone
     TIMEZONE = os.getenv('TIMEZONE', 'America/New_York')
 
-    def validate(self):
-        """Ensure required settings present"""
-        if not self.SMTP_PASSWORD:
+    def digest_jobs(self):
+        """Return the calendar/recipient pairs to send digests for"""
+        jobs = []
+        for pair in self.DIGEST_JOBS.split(','):
+            if not pair.strip():
+                continue
+            calendar_id, sep, recipient = pair.partition('=')
+            recipient, _, name = recipient.partition(':')
+            if not sep or not calendar_id.strip() or not recipient.strip():
+                raise ValueError(f"Invalid DIGEST_JOBS entry: {pair!r}")
+            jobs.append({
+                'calendar_id': calendar_id.strip(),
+                'recipient': recipient.strip(),
+                'name': name.strip() or None,
+            })
+
+        return jobs or [{
+            'calendar_id': self.CALENDAR_ID,
+            'recipient': self.RECIPIENT_EMAIL,
+            'name': self.RECIPIENT_NAME,
+        }]
+
+    def validate(self, require_smtp: bool = True):
+        """
+        Ensure required settings present
+
+        Args:
+            require_smtp: Whether SMTP_PASSWORD is needed, i.e. emails will be sent
+        """
+        # Read every numeric setting once so bad values are reported here
+        for name, value in vars(Config).items():
+            if isinstance(value, _EnvNumber):
+                getattr(self, name)
+
+        if require_smtp and not self.SMTP_PASSWORD:
             raise ValueError("SMTP_PASSWORD not set in .env")
         if not self.GOOGLE_CREDENTIALS.exists():
             raise ValueError(f"Credentials missing: {self.GOOGLE_CREDENTIALS}")
@@ -40,3 +128,4 @@ class Config:
         # Create directories if needed
         self.CREDENTIALS_DIR.mkdir(exist_ok=True)
         self.LOG_DIR.mkdir(exist_ok=True)
+        self.CACHE_DIR.mkdir(exist_ok=True)
@@ -8,17 +8,20 @@ import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
 class EmailSender:
     """Gmail SMTP email sender with retry logic"""
 
-    def __init__(self, smtp_user: str, smtp_password: str):
-        """Initialize with Gmail credentials"""
+    def __init__(self, smtp_user: str, smtp_password: str, rate_limiter: RateLimiter = None):
+        """Initialize with Gmail credentials and an optional shared rate limiter"""
         self.smtp_server = 'smtp.gmail.com'
         self.smtp_port = 587
         self.smtp_user = smtp_user
         self.smtp_password = smtp_password
+        self.rate_limiter = rate_limiter
 
     def send_email(self, to_email: str, subject: str, html_body: str, text_body: str = None) -> bool:
         """
@@ -52,6 +55,10 @@ class EmailSender:
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
+                # Stay within Gmail's per-minute and daily send limits
+                if self.rate_limiter:
+                    self.rate_limiter.acquire('smtp')
+
                 logger.info(f"Sending email to {to_email} (attempt {attempt + 1}/{max_attempts})")
 
                 # Connect to SMTP server
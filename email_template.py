@@ -11,7 +11,7 @@ def generate_calendar_email(events: List[Dict], recipient_name: str = "Noah") ->
 
     Args:
         events: List of formatted event dictionaries
-        recipient_name: Name to use in greeting
+        recipient_name: Name to use in greeting (None for a plain "Hi,")
 
     Returns:
         Dictionary with 'subject', 'html', and 'text' keys
@@ -26,11 +26,13 @@ def generate_calendar_email(events: List[Dict], recipient_name: str = "Noah") ->
     else:
         subject = f"Your Schedule - {event_count} Appointments in the Next 48 Hours"
 
+    greeting = f"Hi {recipient_name}," if recipient_name else "Hi,"
+
     # Generate HTML body
-    html = _generate_html(events, recipient_name)
+    html = _generate_html(events, greeting)
 
     # Generate plain text fallback
-    text = _generate_text(events, recipient_name)
+    text = _generate_text(events, greeting)
 
     return {
         'subject': subject,
@@ -38,7 +40,7 @@ def generate_calendar_email(events: List[Dict], recipient_name: str = "Noah") ->
         'text': text
     }
 
-def _generate_html(events: List[Dict], recipient_name: str) -> str:
+def _generate_html(events: List[Dict], greeting: str) -> str:
     """Generate HTML email body"""
 
     # Generate event cards HTML
@@ -73,7 +75,7 @@ def _generate_html(events: List[Dict], recipient_name: str) -> str:
         <!-- Body -->
         <div style="padding: 30px 20px;">
             <p style="font-size: 16px; color: #374151; margin-bottom: 20px;">
-                Hi {recipient_name},
+                {greeting}
             </p>
 
             <p style="font-size: 16px; color: #374151; margin-bottom: 30px;">
@@ -157,13 +159,13 @@ def _event_card_html(event: Dict) -> str:
 
     return card
 
-def _generate_text(events: List[Dict], recipient_name: str) -> str:
+def _generate_text(events: List[Dict], greeting: str) -> str:
     """Generate plain text email fallback"""
 
     text = f'''Your Schedule - Next 48 Hours
 {'=' * 50}
 
-Hi {recipient_name},
+{greeting}
 
 Here's your upcoming schedule for the next 48 hours:
 
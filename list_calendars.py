@@ -2,74 +2,220 @@
 """
 Helper script to list all accessible calendars
 Run this to find the calendar ID for contact@xshift.ai
+
+Prints a JSON inventory of every calendar with the number of events
+in the upcoming window, so active calendars are easy to spot.
 """
 
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 
-def list_calendars():
-    """List all calendars accessible to the authenticated user"""
+from calendar_client import build_calendar_service
+from config import Config
+from rate_limiter import RateLimiter
 
-    credentials_path = Path(__file__).parent / 'credentials' / 'credentials.json'
-    token_path = Path(__file__).parent / 'credentials' / 'token_nmarbach.json'
-    scopes = ['https://www.googleapis.com/auth/calendar.readonly']
+CREDENTIALS_PATH = Path(__file__).parent / 'credentials' / 'credentials.json'
+TOKEN_PATH = Path(__file__).parent / 'credentials' / 'token_nmarbach.json'
+# One cache file per token, so switching accounts never serves another account's list
+CACHE_PATH = Config.CACHE_DIR / f'calendar_list_{TOKEN_PATH.stem}.json'
+SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+
+def ensure_token():
+    """Make sure a valid token exists, running the OAuth flow if needed"""
 
     creds = None
 
     # Load existing token
-    if token_path.exists():
-        creds = Credentials.from_authorized_user_file(str(token_path), scopes)
+    if TOKEN_PATH.exists():
+        creds = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
+
+    if creds and creds.valid:
+        return
 
     # Get new credentials if needed
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("Refreshing credentials...")
-            creds.refresh(Request())
-        else:
-            print("Starting OAuth flow...")
-            print("Sign in as nmarbach@gmail.com when browser opens")
-            flow = InstalledAppFlow.from_client_secrets_file(
-                str(credentials_path), scopes
-            )
-            creds = flow.run_local_server(port=0)
-
-        # Save credentials
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-        print(f"Token saved to {token_path}\n")
-
-    # Build calendar service
-    service = build('calendar', 'v3', credentials=creds)
-
-    print("=" * 70)
-    print("Listing all accessible calendars:")
-    print("=" * 70)
-
-    # Get calendar list
-    calendar_list = service.calendarList().list().execute()
-
-    for calendar in calendar_list.get('items', []):
-        calendar_id = calendar['id']
-        summary = calendar.get('summary', '(No name)')
-        access_role = calendar.get('accessRole', 'unknown')
-        primary = ' [PRIMARY]' if calendar.get('primary', False) else ''
-
-        print(f"\nCalendar: {summary}{primary}")
-        print(f"  ID: {calendar_id}")
-        print(f"  Access: {access_role}")
-
-        # Highlight if it's the xshift calendar
-        if 'xshift' in calendar_id.lower() or 'xshift' in summary.lower():
-            print("  >>> THIS IS THE XSHIFT CALENDAR <<<")
-
-    print("\n" + "=" * 70)
-    print("Copy the calendar ID for contact@xshift.ai and update .env file")
-    print("Add this line to .env:")
-    print("CALENDAR_ID=<paste the ID here>")
-    print("=" * 70)
+    if creds and creds.expired and creds.refresh_token:
+        print("Refreshing credentials...", file=sys.stderr)
+        creds.refresh(Request())
+    else:
+        print("Starting OAuth flow...", file=sys.stderr)
+        print("Sign in as nmarbach@gmail.com when browser opens", file=sys.stderr)
+        flow = InstalledAppFlow.from_client_secrets_file(
+            str(CREDENTIALS_PATH), SCOPES
+        )
+        creds = flow.run_local_server(port=0)
+
+    # Save credentials
+    with open(TOKEN_PATH, 'w') as token:
+        token.write(creds.to_json())
+    print(f"Token saved to {TOKEN_PATH}", file=sys.stderr)
+
+def fetch_calendar_list(service, limiter: RateLimiter):
+    """Page through the full calendar list"""
+
+    calendars = []
+    page_token = None
+
+    while True:
+        limiter.acquire('calendar')
+        result = service.calendarList().list(pageToken=page_token).execute()
+        calendars.extend(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return calendars
+
+def load_calendar_list(service, limiter: RateLimiter, ttl_seconds: int, refresh: bool = False):
+    """Return the calendar list from the on-disk cache, or fetch and cache it"""
+
+    if not refresh and CACHE_PATH.exists():
+        try:
+            with open(CACHE_PATH, 'r') as f:
+                cached = json.load(f)
+            if cached['token'] == TOKEN_PATH.name and time.time() - cached['fetched_at'] <= ttl_seconds:
+                return cached['items']
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable cache, fetch again
+
+    calendars = fetch_calendar_list(service, limiter)
+    save_calendar_list(calendars)
+
+    return calendars
+
+def save_calendar_list(calendars):
+    """Write the calendar list cache atomically; a failed write is not fatal"""
+
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_PATH.with_suffix(CACHE_PATH.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'token': TOKEN_PATH.name, 'fetched_at': time.time(), 'items': calendars}, f)
+        tmp_path.replace(CACHE_PATH)
+    except OSError as e:
+        print(f"Could not save calendar list cache {CACHE_PATH}: {e}", file=sys.stderr)
+
+def count_upcoming_events(service, calendar_id: str, hours: int, limiter: RateLimiter) -> int:
+    """Count events in a calendar from now until `hours` from now"""
+
+    now = datetime.now(timezone.utc)
+    end_time = now + timedelta(hours=hours)
+    count = 0
+    page_token = None
+
+    while True:
+        limiter.acquire('calendar')
+        result = service.events().list(
+            calendarId=calendar_id,
+            timeMin=now.isoformat(),
+            timeMax=end_time.isoformat(),
+            singleEvents=True,
+            maxResults=2500,
+            fields='items(id),nextPageToken',
+            pageToken=page_token
+        ).execute()
+        count += len(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return count
+
+def build_limiter(rate: float) -> RateLimiter:
+    """
+    Shared Calendar API limiter from Config, so probes are coordinated with
+    other processes. A positive rate adds an evenly spaced local cap, so the
+    effective rate is min(rate, CALENDAR_REQUESTS_PER_SECOND).
+    """
+
+    limiter = RateLimiter.from_config(Config())
+    if rate > 0:
+        limiter.add_limit('calendar', rate, capacity=1)
+    return limiter
+
+def probe_calendars(calendars, hours: int, workers: int, limiter: RateLimiter):
+    """Count upcoming events for every calendar concurrently"""
+
+    local = threading.local()
+
+    def probe(calendar):
+        # API service objects are not thread-safe, so each worker builds its own
+        if not hasattr(local, 'service'):
+            local.service = build_calendar_service(TOKEN_PATH)
+
+        entry = {
+            'id': calendar['id'],
+            'summary': calendar.get('summary', '(No name)'),
+            'access_role': calendar.get('accessRole', 'unknown'),
+            'primary': calendar.get('primary', False),
+        }
+        try:
+            entry['upcoming_events'] = count_upcoming_events(local.service, calendar['id'], hours, limiter)
+        except Exception as e:
+            entry['upcoming_events'] = None
+            entry['error'] = str(e)
+        return entry
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(probe, calendars))
+
+def list_calendars(hours: int = 48, workers: int = 8, rate: float = 0.0,
+                   cache_ttl: int = 3600, refresh: bool = False):
+    """List all calendars accessible to the authenticated user as JSON"""
+
+    ensure_token()
+    service = build_calendar_service(TOKEN_PATH)
+
+    limiter = build_limiter(rate)
+    calendars = load_calendar_list(service, limiter, cache_ttl, refresh)
+    inventory = probe_calendars(calendars, hours, workers, limiter)
+
+    print(json.dumps({
+        'window_hours': hours,
+        'calendars': inventory,
+    }, indent=2))
+
+    print("\nCopy the calendar ID for contact@xshift.ai and add it to .env as "
+          "CALENDAR_ID=<id>", file=sys.stderr)
+
+def _non_negative_float(value: str) -> float:
+    """argparse type for a float that must be >= 0"""
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+def _positive_int(value: str) -> int:
+    """argparse type for an int that must be >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, got {value}")
+    return number
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="List accessible calendars as JSON")
+    parser.add_argument('--hours', type=int, default=48, help="Upcoming window to count events in (default: 48)")
+    parser.add_argument('--workers', type=_positive_int, default=8, help="Concurrent probe threads (default: 8)")
+    parser.add_argument('--rate', type=_non_negative_float, default=0.0,
+                        help="Cap probe requests per second below the shared "
+                             "CALENDAR_REQUESTS_PER_SECOND limit; the effective rate is the "
+                             "lower of the two (default: 0, shared limit only)")
+    parser.add_argument('--cache-ttl', type=int, default=3600, help="Seconds to reuse the cached calendar list (default: 3600)")
+    parser.add_argument('--refresh', action='store_true', help="Ignore the cached calendar list")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    list_calendars()
+    args = parse_args()
+    list_calendars(
+        hours=args.hours,
+        workers=args.workers,
+        rate=args.rate,
+        cache_ttl=args.cache_ttl,
+        refresh=args.refresh
+    )
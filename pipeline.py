@@ -0,0 +1,192 @@
+"""
+Pipelined fetch -> render -> send execution for many calendar digests
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the work stream on a stage's input queue
+_DONE = object()
+
+class DigestPipeline:
+    """
+    Runs digest jobs through fetch, render and send worker pools connected
+    by bounded queues. A slow stage fills its input queue, which blocks the
+    stage before it, so backpressure reaches all the way back to the caller.
+    """
+
+    def __init__(self, fetch: Callable, render: Callable, send: Callable,
+                 fetch_workers: int = 4, render_workers: int = 2, send_workers: int = 2,
+                 queue_size: int = 8, rate_limiter=None):
+        """
+        Initialize the pipeline
+
+        Args:
+            fetch: fetch(job) -> list of events
+            render: render(job, events) -> email content dict
+            send: send(job, content) -> True if sent successfully
+            fetch_workers: Threads fetching calendar events
+            render_workers: Threads generating email content
+            send_workers: Threads sending emails
+            queue_size: Capacity of each queue between stages
+            rate_limiter: RateLimiter used by the stages, for wait-time metrics (optional)
+        """
+        # A stage without workers would drop every job or block forever on a full queue
+        for name, count in (('fetch_workers', fetch_workers), ('render_workers', render_workers),
+                            ('send_workers', send_workers), ('queue_size', queue_size)):
+            if count < 1:
+                raise ValueError(f"{name} must be at least 1, got {count}")
+
+        self.stages = [
+            ('fetch', fetch, fetch_workers),
+            ('render', render, render_workers),
+            ('send', send, send_workers),
+        ]
+        self.queue_size = queue_size
+        self.rate_limiter = rate_limiter
+
+    def run(self, jobs: List[Dict]) -> Dict:
+        """
+        Process all jobs and return run metrics.
+        Errors are collected per job instead of stopping the run.
+        """
+
+        metrics = _new_metrics(len(jobs))
+        waited_before = _limiter_wait(self.rate_limiter)
+        lock = threading.Lock()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        start = time.perf_counter()
+
+        threads = []
+        for i, (name, func, worker_count) in enumerate(self.stages):
+            out_queue = queues[i + 1] if i + 1 < len(queues) else None
+            stage_threads = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(name, func, queues[i], out_queue, metrics, lock),
+                    name=f"{name}-{n}",
+                    daemon=True
+                )
+                for n in range(worker_count)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            threads.append(stage_threads)
+
+        # Feed jobs; put() blocks while the fetch stage is saturated
+        for job in jobs:
+            queues[0].put((job, None))
+
+        # Shut stages down in order once everything upstream has drained
+        for i, stage_threads in enumerate(threads):
+            for _ in stage_threads:
+                queues[i].put(_DONE)
+            for thread in stage_threads:
+                thread.join()
+
+        metrics['elapsed_seconds'] = time.perf_counter() - start
+        metrics['limiter_wait_seconds'] = _limiter_wait(self.rate_limiter, waited_before)
+        return metrics
+
+    def _worker(self, name, func, in_queue, out_queue, metrics, lock):
+        """Take items from in_queue, apply the stage function, pass results on"""
+
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                return
+
+            job, payload = item
+            started = time.perf_counter()
+            try:
+                result = _call_stage(name, func, job, payload)
+            except Exception as e:
+                logger.error(f"{name} failed for {_describe(job)}: {e}")
+                with lock:
+                    metrics['stage_seconds'][name] += time.perf_counter() - started
+                    _record_error(metrics, job, name, e)
+                continue
+
+            with lock:
+                metrics['stage_seconds'][name] += time.perf_counter() - started
+                if out_queue is None:
+                    metrics['sent'] += 1
+
+            if out_queue is not None:
+                out_queue.put((job, result))
+
+def run_sequential(jobs: List[Dict], fetch: Callable, render: Callable, send: Callable,
+                   rate_limiter=None) -> Dict:
+    """Process jobs one stage at a time, one job after another"""
+
+    metrics = _new_metrics(len(jobs))
+    waited_before = _limiter_wait(rate_limiter)
+    start = time.perf_counter()
+
+    for job in jobs:
+        payload = None
+        for name, func in (('fetch', fetch), ('render', render), ('send', send)):
+            started = time.perf_counter()
+            try:
+                payload = _call_stage(name, func, job, payload)
+            except Exception as e:
+                logger.error(f"{name} failed for {_describe(job)}: {e}")
+                _record_error(metrics, job, name, e)
+                break
+            finally:
+                metrics['stage_seconds'][name] += time.perf_counter() - started
+        else:
+            metrics['sent'] += 1
+
+    metrics['elapsed_seconds'] = time.perf_counter() - start
+    metrics['limiter_wait_seconds'] = _limiter_wait(rate_limiter, waited_before)
+    return metrics
+
+def _call_stage(name: str, func: Callable, job: Dict, payload):
+    """Invoke one stage function with the arguments it expects"""
+
+    if name == 'fetch':
+        return func(job)
+
+    result = func(job, payload)
+    if name == 'send' and not result:
+        raise RuntimeError("email was not sent")
+    return result
+
+def _new_metrics(job_count: int) -> Dict:
+    """Return an empty metrics dictionary for a run"""
+    return {
+        'jobs': job_count,
+        'sent': 0,
+        'errors': [],
+        'stage_seconds': {'fetch': 0.0, 'render': 0.0, 'send': 0.0},
+        'elapsed_seconds': 0.0,
+        'limiter_wait_seconds': {},
+    }
+
+def _limiter_wait(rate_limiter, since: Dict = None) -> Dict:
+    """Seconds waited on each rate limit, minus an earlier snapshot"""
+    if rate_limiter is None:
+        return {}
+    since = since or {}
+    return {
+        resource: waited - since.get(resource, 0.0)
+        for resource, waited in rate_limiter.wait_seconds().items()
+    }
+
+def _record_error(metrics: Dict, job: Dict, stage: str, error: Exception):
+    """Add a per-job error entry to the metrics"""
+    metrics['errors'].append({
+        'job': job,
+        'stage': stage,
+        'error': str(error),
+    })
+
+def _describe(job: Dict) -> str:
+    """Short description of a job for log messages"""
+    return f"{job.get('calendar_id')} -> {job.get('recipient')}"
@@ -0,0 +1,213 @@
+"""
+Token-bucket rate limiting for Calendar API and SMTP requests
+"""
+
+import asyncio
+import errno
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`.
+
+    Callers reserve tokens up front and then wait out any deficit, so the
+    same bucket can be shared by threads and asyncio tasks. With a
+    state_path the bucket is stored in a file guarded by an OS file lock,
+    which lets separate processes share one budget.
+    """
+
+    def __init__(self, rate: float, capacity: float, state_path: Path = None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held, i.e. the largest allowed burst
+            state_path: Optional file used to coordinate across processes
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.state_path = state_path
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until tokens are available; return seconds spent waiting"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Async version of acquire that yields to the event loop while waiting"""
+        if self.state_path is None:
+            delay = self.reserve(tokens)
+        else:
+            # File locking and I/O block, so keep them off the event loop
+            delay = await asyncio.to_thread(self.reserve, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens now, going into debt if needed, and return the seconds
+        the caller must wait before using them. Does not sleep.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+
+        with self._lock:
+            if self.state_path is None:
+                now = time.monotonic()
+                self._tokens, delay = self._take(self._tokens, now - self._updated, tokens)
+                self._updated = now
+                return delay
+
+            # Other processes read the same file, so use wall-clock time
+            with _file_lock(self.state_path.with_suffix('.lock')):
+                now = time.time()
+                state = self._read_state(now)
+                level, delay = self._take(state['tokens'], now - state['updated'], tokens)
+                self._write_state({'tokens': level, 'updated': now})
+                return delay
+
+    def _take(self, level: float, elapsed: float, tokens: float):
+        """Refill for elapsed seconds, remove tokens, return (new level, delay)"""
+        level = min(self.capacity, level + max(elapsed, 0) * self.rate) - tokens
+        delay = -level / self.rate if level < 0 else 0.0
+        return level, delay
+
+    def _read_state(self, now: float) -> Dict:
+        """Load the shared bucket state, starting full if there is none"""
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'tokens': self.capacity, 'updated': now}
+
+    def _write_state(self, state: Dict):
+        """Save the shared bucket state"""
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """Hold an exclusive OS-level lock on lock_path"""
+
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # LK_LOCK gives up after 10 one-second retries; keep waiting
+                    if e.errno != errno.EDEADLOCK:
+                        raise
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+class RateLimiter:
+    """
+    Named set of token buckets, one or more per resource.
+    A request must get a token from every bucket of its resource.
+    """
+
+    def __init__(self):
+        """Initialize with no limits; unknown resources are never throttled"""
+        self.buckets = {}  # resource -> list of TokenBucket
+        self._wait = {}    # resource -> total seconds waited
+        self._lock = threading.Lock()
+
+    def add_limit(self, resource: str, rate: float, capacity: float, state_path: Path = None):
+        """Add a bucket of `rate` tokens per second and `capacity` burst to a resource"""
+        bucket = TokenBucket(rate, capacity, state_path)
+        with self._lock:
+            self.buckets.setdefault(resource, []).append(bucket)
+            self._wait.setdefault(resource, 0.0)
+        return bucket
+
+    def acquire(self, resource: str) -> float:
+        """Block until the resource may be used; return seconds waited"""
+        delay = self._reserve(resource)
+        if delay > 0:
+            logger.debug(f"Rate limit: waiting {delay:.2f}s for {resource}")
+            time.sleep(delay)
+        self._record(resource, delay)
+        return delay
+
+    async def acquire_async(self, resource: str) -> float:
+        """Async version of acquire"""
+        buckets = self.buckets.get(resource, [])
+        if any(b.state_path for b in buckets):
+            # File locking and I/O block, so keep them off the event loop
+            delay = await asyncio.to_thread(self._reserve, resource)
+        else:
+            delay = self._reserve(resource)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._record(resource, delay)
+        return delay
+
+    def _reserve(self, resource: str) -> float:
+        """Reserve a token from every bucket of a resource; return the longest wait"""
+        return max((b.reserve(1) for b in self.buckets.get(resource, [])), default=0.0)
+
+    def wait_seconds(self) -> Dict[str, float]:
+        """Return total seconds spent waiting, per resource"""
+        with self._lock:
+            return dict(self._wait)
+
+    def _record(self, resource: str, delay: float):
+        with self._lock:
+            self._wait[resource] = self._wait.get(resource, 0.0) + delay
+
+    @classmethod
+    def from_config(cls, config) -> 'RateLimiter':
+        """Build the Calendar and SMTP limits from Config"""
+
+        def state_path(name):
+            if not config.RATE_LIMIT_STATE_DIR:
+                return None
+            return Path(config.RATE_LIMIT_STATE_DIR) / f"{name}.json"
+
+        limiter = cls()
+        limiter.add_limit('calendar', config.CALENDAR_REQUESTS_PER_SECOND, config.CALENDAR_BURST,
+                          state_path('calendar'))
+        limiter.add_limit('smtp', config.SMTP_SENDS_PER_MINUTE / 60, config.SMTP_SENDS_PER_MINUTE,
+                          state_path('smtp_minute'))
+        limiter.add_limit('smtp', config.SMTP_SENDS_PER_DAY / 86400, config.SMTP_SENDS_PER_DAY,
+                          state_path('smtp_day'))
+        return limiter
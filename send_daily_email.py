@@ -10,6 +10,7 @@ Designed to run daily at 9:00 AM via Windows Task Scheduler
 
 import logging
 import sys
+import threading
 from datetime import datetime
 
 def setup_logging():
@@ -49,59 +50,109 @@ def main():
         from config import Config
         config = Config()
         config.validate()
-        logger.info(f"Configuration loaded - Recipient: {config.RECIPIENT_EMAIL}")
+        jobs = config.digest_jobs()
+        logger.info(f"Configuration loaded - {len(jobs)} digest(s) for: "
+                    f"{', '.join(job['recipient'] for job in jobs)}")
 
         # 2. Initialize calendar client
         from calendar_client import CalendarClient
+        from attendee_resolver import AttendeeResolver
+        from rate_limiter import RateLimiter
+        rate_limiter = RateLimiter.from_config(config)
+        attendee_resolver = AttendeeResolver.from_config(config)
+
+        def make_calendar_client():
+            return CalendarClient(
+                credentials_path=config.GOOGLE_CREDENTIALS,
+                token_path=config.GOOGLE_TOKEN,
+                calendar_id=config.CALENDAR_ID,
+                timezone=config.TIMEZONE,
+                attendee_resolver=attendee_resolver,
+                rate_limiter=rate_limiter
+            )
+
+        # Authenticate once up front so the token is refreshed before workers start.
+        # The first fetch worker reuses this client.
         logger.info(f"Initializing calendar client for calendar: {config.CALENDAR_ID}")
-        calendar = CalendarClient(
-            credentials_path=config.GOOGLE_CREDENTIALS,
-            token_path=config.GOOGLE_TOKEN,
-            calendar_id=config.CALENDAR_ID,
-            timezone=config.TIMEZONE
-        )
+        spare_clients = [make_calendar_client()]
+        spare_lock = threading.Lock()
+
+        # API service objects are not thread-safe, so each fetch worker gets its own
+        clients = threading.local()
 
         # 3. Fetch events for next 48 hours
-        logger.info("Fetching calendar events for next 48 hours...")
-        events = calendar.get_events_next_48h()
-        logger.info(f"Found {len(events)} event(s)")
+        def fetch(job):
+            if not hasattr(clients, 'calendar'):
+                with spare_lock:
+                    client = spare_clients.pop() if spare_clients else None
+                clients.calendar = client or make_calendar_client()
+
+            logger.info(f"Fetching calendar events for next 48 hours from {job['calendar_id']}...")
+            events = clients.calendar.get_events_next_48h(job['calendar_id'])
+            logger.info(f"Found {len(events)} event(s) in {job['calendar_id']}")
+
+            # Log event details
+            for i, event in enumerate(events, 1):
+                logger.info(f"  {i}. {event['title']} - {event['date']} at {event['time']}")
 
-        # Log event details
-        for i, event in enumerate(events, 1):
-            logger.info(f"  {i}. {event['title']} - {event['date']} at {event['time']}")
+            return events
 
         # 4. Generate email HTML
         from email_template import generate_calendar_email
-        logger.info("Generating email content...")
-        email_content = generate_calendar_email(
-            events=events,
-            recipient_name="Noah"
-        )
-        logger.info(f"Email subject: {email_content['subject']}")
+
+        def render(job, events):
+            email_content = generate_calendar_email(
+                events=events,
+                recipient_name=job.get('name')
+            )
+            logger.info(f"Email subject for {job['recipient']}: {email_content['subject']}")
+            return email_content
 
         # 5. Send email
         from email_sender import EmailSender
-        logger.info("Sending email...")
         sender = EmailSender(
             smtp_user=config.SMTP_USER,
-            smtp_password=config.SMTP_PASSWORD
+            smtp_password=config.SMTP_PASSWORD,
+            rate_limiter=rate_limiter
         )
 
-        success = sender.send_email(
-            to_email=config.RECIPIENT_EMAIL,
-            subject=email_content['subject'],
-            html_body=email_content['html'],
-            text_body=email_content['text']
+        def send(job, email_content):
+            return sender.send_email(
+                to_email=job['recipient'],
+                subject=email_content['subject'],
+                html_body=email_content['html'],
+                text_body=email_content['text']
+            )
+
+        # Fetch, render and send overlap across digests
+        from pipeline import DigestPipeline
+        pipeline = DigestPipeline(
+            fetch, render, send,
+            fetch_workers=config.FETCH_WORKERS,
+            render_workers=config.RENDER_WORKERS,
+            send_workers=config.SEND_WORKERS,
+            rate_limiter=rate_limiter
         )
+        result = pipeline.run(jobs)
+
+        # Keep resolved attendee names for the next run
+        attendee_resolver.save()
+        logger.info(f"Sent {result['sent']}/{result['jobs']} digest(s) in {result['elapsed_seconds']:.1f}s")
+        for resource, waited in result['limiter_wait_seconds'].items():
+            logger.info(f"Rate limit wait for {resource}: {waited:.1f}s")
 
-        if success:
+        if not result['errors'] and result['sent'] == result['jobs']:
             logger.info("=" * 60)
             logger.info("Daily calendar email job completed successfully")
             logger.info("=" * 60)
             sys.exit(0)
         else:
             logger.error("=" * 60)
-            logger.error("Failed to send email")
+            for error in result['errors']:
+                logger.error(f"Failed to send email to {error['job']['recipient']} "
+                             f"({error['stage']}): {error['error']}")
+            if result['sent'] + len(result['errors']) != result['jobs']:
+                logger.error(f"Only {result['sent']} of {result['jobs']} digest(s) were sent")
             logger.error("=" * 60)
             sys.exit(1)
 
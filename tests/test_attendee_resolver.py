@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import attendee_resolver
+from attendee_resolver import AttendeeResolver, DirectoryBackend, LRUTTLCache, StaticDirectory
+
+class FailingDirectory(DirectoryBackend):
+    def __init__(self):
+        self.lookups = 0
+
+    def lookup(self, email):
+        self.lookups += 1
+        raise RuntimeError("directory unavailable")
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+def test_display_name_takes_priority_over_backend():
+    directory = StaticDirectory({'alice@example.com': 'Alice Directory'})
+    resolver = AttendeeResolver(directory)
+
+    name = resolver.resolve({'email': 'alice@example.com', 'displayName': 'Alice Event'})
+
+    assert name == 'Alice Event'
+    assert directory.lookups == 0
+    # The event-supplied name is cached for events that omit it
+    assert resolver.resolve({'email': 'ALICE@example.com'}) == 'Alice Event'
+    assert directory.lookups == 0
+
+def test_backend_consulted_once_per_address_within_ttl():
+    directory = StaticDirectory({'bob@example.com': 'Bob'})
+    resolver = AttendeeResolver(directory)
+
+    for _ in range(3):
+        assert resolver.resolve({'email': 'bob@example.com'}) == 'Bob'
+        assert resolver.resolve({'email': 'unknown@example.com'}) == 'unknown@example.com'
+
+    assert directory.lookups == 2
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(attendee_resolver, 'time', clock)
+    directory = StaticDirectory({'bob@example.com': 'Bob'})
+    resolver = AttendeeResolver(directory, LRUTTLCache(ttl_seconds=60))
+
+    resolver.resolve({'email': 'bob@example.com'})
+    clock.now += 59
+    resolver.resolve({'email': 'bob@example.com'})
+    assert directory.lookups == 1
+
+    clock.now += 2
+    resolver.resolve({'email': 'bob@example.com'})
+    assert directory.lookups == 2
+
+def test_lru_evicts_least_recently_used_at_max_size():
+    cache = LRUTTLCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / 'cache' / 'names.json'
+    directory = StaticDirectory({'bob@example.com': 'Bob'})
+    resolver = AttendeeResolver(directory, LRUTTLCache(persist_path=path))
+    resolver.resolve({'email': 'bob@example.com'})
+    resolver.resolve({'email': 'carol@example.com', 'displayName': 'Carol'})
+    resolver.save()
+
+    reloaded = AttendeeResolver(directory, LRUTTLCache(persist_path=path))
+
+    assert len(reloaded.cache) == 2
+    assert reloaded.resolve({'email': 'bob@example.com'}) == 'Bob'
+    assert reloaded.resolve({'email': 'carol@example.com'}) == 'Carol'
+    assert directory.lookups == 1
+
+def test_backend_failures_are_not_cached():
+    directory = FailingDirectory()
+    resolver = AttendeeResolver(directory)
+
+    assert resolver.resolve({'email': 'dave@example.com'}) == 'dave@example.com'
+    assert resolver.resolve({'email': 'dave@example.com'}) == 'dave@example.com'
+    assert directory.lookups == 2
+    assert len(resolver.cache) == 0
+
+def test_concurrent_resolves_query_backend_once():
+    class SlowDirectory(StaticDirectory):
+        def lookup(self, email):
+            time.sleep(0.05)
+            return super().lookup(email)
+
+    directory = SlowDirectory({'erin@example.com': 'Erin'})
+    resolver = AttendeeResolver(directory)
+    names = []
+
+    threads = [
+        threading.Thread(target=lambda: names.append(resolver.resolve({'email': 'erin@example.com'})))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert names == ['Erin'] * 8
+    assert directory.lookups == 1
+
+def test_from_config_uses_directory_file(tmp_path):
+    directory_file = tmp_path / 'directory.json'
+    directory_file.write_text(json.dumps({'Frank@example.com': 'Frank'}))
+    config = SimpleNamespace(
+        ATTENDEE_DIRECTORY_FILE=str(directory_file),
+        ATTENDEE_CACHE_SIZE=16,
+        ATTENDEE_CACHE_TTL=60,
+        ATTENDEE_CACHE_FILE=tmp_path / 'names.json',
+    )
+
+    resolver = AttendeeResolver.from_config(config)
+
+    assert resolver.resolve({'email': 'frank@example.com'}) == 'Frank'
+
+def test_from_config_without_directory_file_uses_display_names_only(tmp_path):
+    config = SimpleNamespace(
+        ATTENDEE_DIRECTORY_FILE='',
+        ATTENDEE_CACHE_SIZE=16,
+        ATTENDEE_CACHE_TTL=60,
+        ATTENDEE_CACHE_FILE=tmp_path / 'names.json',
+    )
+
+    resolver = AttendeeResolver.from_config(config)
+
+    assert resolver.backend is None
+    assert resolver.resolve({'email': 'gina@example.com'}) == 'gina@example.com'
@@ -0,0 +1,37 @@
+import pytest
+
+from config import Config
+
+def test_numeric_settings_are_read_from_environment(monkeypatch):
+    monkeypatch.setenv('FETCH_WORKERS', '7')
+    monkeypatch.setenv('CALENDAR_REQUESTS_PER_SECOND', '2.5')
+
+    assert Config().FETCH_WORKERS == 7
+    assert Config.CALENDAR_REQUESTS_PER_SECOND == 2.5
+
+def test_bad_numeric_setting_raises_value_error_when_validated(monkeypatch, tmp_path):
+    monkeypatch.setenv('FETCH_WORKERS', 'four')
+    monkeypatch.setenv('SMTP_PASSWORD', 'secret')
+
+    with pytest.raises(ValueError, match="FETCH_WORKERS must be a number, got 'four'"):
+        Config().validate()
+
+def test_digest_jobs_parse_optional_names(monkeypatch):
+    monkeypatch.setattr(Config, 'DIGEST_JOBS', 'team=a@example.com:Ann, primary=b@example.com')
+
+    assert Config().digest_jobs() == [
+        {'calendar_id': 'team', 'recipient': 'a@example.com', 'name': 'Ann'},
+        {'calendar_id': 'primary', 'recipient': 'b@example.com', 'name': None},
+    ]
+
+def test_validate_can_skip_smtp_password(monkeypatch, tmp_path):
+    credentials = tmp_path / 'credentials.json'
+    credentials.write_text('{}')
+    monkeypatch.setattr(Config, 'SMTP_PASSWORD', None)
+    monkeypatch.setattr(Config, 'GOOGLE_CREDENTIALS', credentials)
+    for name in ('CREDENTIALS_DIR', 'LOG_DIR', 'CACHE_DIR'):
+        monkeypatch.setattr(Config, name, tmp_path / name.lower())
+
+    with pytest.raises(ValueError, match="SMTP_PASSWORD"):
+        Config().validate()
+    Config().validate(require_smtp=False)
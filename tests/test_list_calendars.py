@@ -0,0 +1,143 @@
+import json
+import time
+
+import pytest
+
+import list_calendars
+from rate_limiter import RateLimiter
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+class FakeCalendarService:
+    """Stands in for the Calendar API service's calendarList and events resources"""
+
+    def __init__(self, calendar_pages, event_pages=None):
+        self.calendar_pages = calendar_pages  # list of item lists
+        self.event_pages = event_pages or {}   # calendar_id -> list of item lists, or an Exception
+        self.calendar_list_calls = []
+        self.event_calls = []
+
+    def calendarList(self):
+        return self
+
+    def events(self):
+        return self
+
+    def list(self, pageToken=None, calendarId=None, **kwargs):
+        if calendarId is None:
+            self.calendar_list_calls.append(pageToken)
+            return FakeRequest(self._page(self.calendar_pages, pageToken))
+
+        self.event_calls.append((calendarId, pageToken))
+        pages = self.event_pages.get(calendarId, [[]])
+        if isinstance(pages, Exception):
+            return FakeRequest(pages)
+        return FakeRequest(self._page(pages, pageToken))
+
+    def _page(self, pages, page_token):
+        index = int(page_token) if page_token else 0
+        response = {'items': pages[index]}
+        if index + 1 < len(pages):
+            response['nextPageToken'] = str(index + 1)
+        return response
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / 'calendar_list_token.json'
+    monkeypatch.setattr(list_calendars, 'CACHE_PATH', path)
+    return path
+
+def test_fetch_calendar_list_follows_page_tokens():
+    service = FakeCalendarService([[{'id': 'a'}, {'id': 'b'}], [{'id': 'c'}], [{'id': 'd'}]])
+
+    calendars = list_calendars.fetch_calendar_list(service, RateLimiter())
+
+    assert [c['id'] for c in calendars] == ['a', 'b', 'c', 'd']
+    assert service.calendar_list_calls == [None, '1', '2']
+
+def test_load_calendar_list_uses_fresh_cache(cache_path):
+    service = FakeCalendarService([[{'id': 'a'}]])
+
+    first = list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60)
+    second = list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60)
+
+    assert first == second == [{'id': 'a'}]
+    assert len(service.calendar_list_calls) == 1
+    assert json.loads(cache_path.read_text())['items'] == [{'id': 'a'}]
+
+def test_load_calendar_list_refetches_when_expired_or_refreshing(cache_path):
+    cache_path.write_text(json.dumps({
+        'token': list_calendars.TOKEN_PATH.name,
+        'fetched_at': time.time() - 120,
+        'items': [{'id': 'old'}],
+    }))
+    service = FakeCalendarService([[{'id': 'new'}]])
+
+    assert list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60) == [{'id': 'new'}]
+    assert list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60, refresh=True) == [{'id': 'new'}]
+    assert len(service.calendar_list_calls) == 2
+
+def test_load_calendar_list_ignores_unreadable_or_foreign_cache(cache_path):
+    service = FakeCalendarService([[{'id': 'a'}]])
+
+    cache_path.write_text('{not json')
+    assert list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60) == [{'id': 'a'}]
+
+    cache_path.write_text(json.dumps({'token': 'other_token.json', 'fetched_at': time.time(),
+                                      'items': [{'id': 'other'}]}))
+    assert list_calendars.load_calendar_list(service, RateLimiter(), ttl_seconds=60) == [{'id': 'a'}]
+    assert len(service.calendar_list_calls) == 2
+
+def test_count_upcoming_events_pages_through_results():
+    service = FakeCalendarService([], {'busy': [[{'id': 1}, {'id': 2}], [{'id': 3}]]})
+
+    count = list_calendars.count_upcoming_events(service, 'busy', 48, RateLimiter())
+
+    assert count == 3
+    assert service.event_calls == [('busy', None), ('busy', '1')]
+
+def test_probe_calendars_records_per_calendar_errors(monkeypatch):
+    service = FakeCalendarService([], {
+        'busy': [[{'id': 1}, {'id': 2}]],
+        'broken': RuntimeError("forbidden"),
+    })
+    monkeypatch.setattr(list_calendars, 'build_calendar_service', lambda token_path: service)
+    calendars = [
+        {'id': 'busy', 'summary': 'Busy', 'accessRole': 'owner', 'primary': True},
+        {'id': 'broken', 'summary': 'Broken'},
+        {'id': 'empty'},
+    ]
+
+    inventory = list_calendars.probe_calendars(calendars, 48, workers=1, limiter=RateLimiter())
+
+    assert inventory[0] == {'id': 'busy', 'summary': 'Busy', 'access_role': 'owner',
+                            'primary': True, 'upcoming_events': 2}
+    assert inventory[1]['upcoming_events'] is None
+    assert inventory[1]['error'] == "forbidden"
+    assert inventory[2]['upcoming_events'] == 0
+    assert inventory[2]['summary'] == '(No name)'
+
+@pytest.mark.parametrize('workers', ['0', '-2'])
+def test_workers_must_be_positive(monkeypatch, workers):
+    monkeypatch.setattr('sys.argv', ['list_calendars.py', '--workers', workers])
+
+    with pytest.raises(SystemExit):
+        list_calendars.parse_args()
+
+def test_rate_defaults_to_shared_limit_and_only_lowers_it(monkeypatch, tmp_path):
+    monkeypatch.setattr('sys.argv', ['list_calendars.py'])
+    monkeypatch.setattr(list_calendars.Config, 'RATE_LIMIT_STATE_DIR', str(tmp_path))
+
+    assert list_calendars.parse_args().rate == 0
+    assert len(list_calendars.build_limiter(0).buckets['calendar']) == 1
+
+    capped = list_calendars.build_limiter(2)
+    assert sorted(b.rate for b in capped.buckets['calendar']) == sorted(
+        [2, list_calendars.Config.CALENDAR_REQUESTS_PER_SECOND])
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from bench_pipeline import make_fake_services
+from pipeline import DigestPipeline, run_sequential
+
+def make_jobs(count):
+    return [
+        {'calendar_id': f"calendar-{i}", 'recipient': f"user{i}@example.com"}
+        for i in range(count)
+    ]
+
+def failing_services(fail_fetch, fail_render, fail_send):
+    """Fake services where the given calendars fail in one stage each"""
+    fetch, render, send = make_fake_services(0, 0, events_per_calendar=2)
+
+    def flaky_fetch(job):
+        if job['calendar_id'] in fail_fetch:
+            raise RuntimeError("calendar unavailable")
+        return fetch(job)
+
+    def flaky_render(job, events):
+        if job['calendar_id'] in fail_render:
+            raise ValueError("bad template data")
+        return render(job, events)
+
+    def flaky_send(job, content):
+        if job['calendar_id'] in fail_send:
+            return False
+        return send(job, content)
+
+    return flaky_fetch, flaky_render, flaky_send
+
+@pytest.mark.parametrize('runner', ['pipelined', 'sequential'])
+def test_errors_are_collected_per_job_and_stage(runner):
+    jobs = make_jobs(6)
+    services = failing_services({'calendar-1'}, {'calendar-3'}, {'calendar-5'})
+
+    if runner == 'pipelined':
+        result = DigestPipeline(*services, queue_size=2).run(jobs)
+    else:
+        result = run_sequential(jobs, *services)
+
+    assert result['jobs'] == 6
+    assert result['sent'] == 3
+    failures = {e['job']['calendar_id']: e['stage'] for e in result['errors']}
+    assert failures == {'calendar-1': 'fetch', 'calendar-3': 'render', 'calendar-5': 'send'}
+
+def test_send_returning_false_is_an_error():
+    fetch, render, _ = make_fake_services(0, 0, events_per_calendar=1)
+
+    result = DigestPipeline(fetch, render, lambda job, content: False).run(make_jobs(2))
+
+    assert result['sent'] == 0
+    assert [e['stage'] for e in result['errors']] == ['send', 'send']
+    assert all(e['error'] == "email was not sent" for e in result['errors'])
+
+def test_more_jobs_than_queue_capacity_all_complete():
+    fetch, render, send = make_fake_services(0.001, 0.005, events_per_calendar=1)
+    sent = []
+    lock = threading.Lock()
+
+    def recording_send(job, content):
+        with lock:
+            sent.append(job['calendar_id'])
+        return send(job, content)
+
+    pipeline = DigestPipeline(fetch, render, recording_send,
+                              fetch_workers=2, render_workers=1, send_workers=1, queue_size=1)
+    jobs = make_jobs(30)
+    results = []
+
+    # A deadlock would hang run(), so run it in a thread with a timeout
+    runner = threading.Thread(target=lambda: results.append(pipeline.run(jobs)), daemon=True)
+    runner.start()
+    runner.join(timeout=10)
+
+    assert not runner.is_alive(), "pipeline did not finish"
+    assert results[0]['sent'] == 30
+    assert results[0]['errors'] == []
+    assert sorted(sent) == sorted(job['calendar_id'] for job in jobs)
+
+@pytest.mark.parametrize('option', ['fetch_workers', 'render_workers', 'send_workers', 'queue_size'])
+def test_stage_sizes_below_one_are_rejected(option):
+    fetch, render, send = make_fake_services(0, 0, events_per_calendar=1)
+
+    with pytest.raises(ValueError, match=option):
+        DigestPipeline(fetch, render, send, **{option: 0})
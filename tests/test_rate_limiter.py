@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, TokenBucket
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record requested sleeps instead of sleeping"""
+    sleeps = []
+    monkeypatch.setattr(rate_limiter.time, 'sleep', sleeps.append)
+    return sleeps
+
+def test_bucket_allows_burst_then_paces_at_rate():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+def test_acquire_spaces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.perf_counter()
+
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.perf_counter() - start >= 0.09
+
+def test_acquire_async_paces_tasks():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.perf_counter()
+        await asyncio.gather(*[bucket.acquire_async() for _ in range(6)])
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.09
+
+def test_resource_with_several_buckets_waits_for_the_slowest(no_sleep):
+    limiter = RateLimiter()
+    limiter.add_limit('smtp', rate=10, capacity=1)
+    limiter.add_limit('smtp', rate=1, capacity=1)
+
+    limiter.acquire('smtp')
+    delay = limiter.acquire('smtp')
+
+    assert delay == pytest.approx(1.0, abs=0.01)
+    assert no_sleep == [delay]
+
+def test_wait_seconds_accumulates_per_resource(no_sleep):
+    limiter = RateLimiter()
+    limiter.add_limit('calendar', rate=10, capacity=1)
+    limiter.add_limit('smtp', rate=100, capacity=5)
+
+    for _ in range(3):
+        limiter.acquire('calendar')
+        limiter.acquire('smtp')
+
+    waited = limiter.wait_seconds()
+    assert waited['calendar'] == pytest.approx(sum(no_sleep), abs=0.01)
+    assert waited['calendar'] == pytest.approx(0.3, abs=0.02)
+    assert waited['smtp'] == 0.0
+    assert limiter.acquire('unlimited') == 0.0
+
+def test_buckets_sharing_a_state_path_share_one_budget(tmp_path):
+    state_path = tmp_path / 'shared' / 'smtp.json'
+    first = TokenBucket(rate=1, capacity=2, state_path=state_path)
+    second = TokenBucket(rate=1, capacity=2, state_path=state_path)
+
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == pytest.approx(1.0, abs=0.05)
+    assert second.reserve() == pytest.approx(2.0, abs=0.05)
+
+def test_async_acquire_with_state_path(tmp_path):
+    bucket = TokenBucket(rate=100, capacity=1, state_path=tmp_path / 'calendar.json')
+
+    async def run():
+        return await asyncio.gather(*[bucket.acquire_async() for _ in range(3)])
+
+    delays = asyncio.run(run())
+    assert sorted(delays)[0] == 0.0
+    assert sorted(delays)[2] == pytest.approx(0.02, abs=0.01)
+
+def test_windows_file_lock_keeps_retrying_until_acquired(monkeypatch, tmp_path):
+    class FakeMsvcrt:
+        LK_LOCK, LK_UNLCK = 1, 0
+
+        def __init__(self):
+            self.calls = []
+
+        def locking(self, fd, mode, nbytes):
+            self.calls.append(mode)
+            # LK_LOCK raises EDEADLOCK each time its own retries run out
+            if mode == self.LK_LOCK and self.calls.count(self.LK_LOCK) < 3:
+                raise OSError(rate_limiter.errno.EDEADLOCK, "Resource deadlock avoided")
+
+    msvcrt = FakeMsvcrt()
+    monkeypatch.setattr(rate_limiter, 'fcntl', None)
+    monkeypatch.setattr(rate_limiter, 'msvcrt', msvcrt, raising=False)
+
+    with rate_limiter._file_lock(tmp_path / 'bucket.lock'):
+        pass
+
+    assert msvcrt.calls == [1, 1, 1, 0]
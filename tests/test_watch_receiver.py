@@ -0,0 +1,161 @@
+import http.client
+import threading
+import time
+
+import pytest
+
+from watch_receiver import WatchManager, make_server, simulate_notification
+
+class FakeCalendarClient:
+    """Stands in for CalendarClient's watch, stop and fetch calls"""
+
+    def __init__(self, expires_in=7 * 86400):
+        self.expires_in = expires_in
+        self.events = [{'id': 'standup', 'etag': '"1"', 'title': 'Standup', 'date': 'Tomorrow'}]
+        self.fetches = []
+        self.watched = []
+        self.stopped = []
+
+    def watch_events(self, address, channel_id, token=None, ttl_seconds=None, calendar_id=None):
+        self.watched.append(calendar_id)
+        return {
+            'id': channel_id,
+            'resourceId': f"resource-{len(self.watched)}",
+            'expiration': str(int((time.time() + self.expires_in) * 1000)),
+        }
+
+    def stop_channel(self, channel_id, resource_id):
+        self.stopped.append(resource_id)
+
+    def get_events_next_48h(self, calendar_id=None):
+        self.fetches.append(calendar_id)
+        return list(self.events)
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+@pytest.fixture
+def receiver():
+    """A running receiver backed by a fake client; yields (manager, client, url, changes)"""
+    client = FakeCalendarClient()
+    changes = []
+    manager = WatchManager(client, 'https://example.com/notify',
+                           on_change=lambda calendar_id, events: changes.append((calendar_id, events)),
+                           debounce_seconds=0.2)
+    server = make_server(manager, '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield manager, client, f"http://127.0.0.1:{server.server_port}/", changes
+
+    server.shutdown()
+    server.server_close()
+    manager.stop()
+
+def test_status_codes_for_known_bad_token_and_unknown_channels(receiver):
+    manager, client, url, changes = receiver
+    channel = manager.watch('primary')
+
+    assert simulate_notification(url, channel['id'], channel['token'], state='sync') == 200
+    assert simulate_notification(url, channel['id'], 'wrong-token') == 403
+    assert simulate_notification(url, 'no-such-channel', channel['token']) == 404
+
+def test_burst_of_notifications_is_debounced_into_one_refetch(receiver):
+    manager, client, url, changes = receiver
+    manager.start(['primary'], check_interval=3600)
+    channel = next(iter(manager.channels.values()))
+    client.events = [{'id': 'standup', 'etag': '"2"', 'title': 'Moved standup', 'date': 'Tomorrow'}]
+
+    statuses = [simulate_notification(url, channel['id'], channel['token'], message_number=n)
+                for n in range(5)]
+
+    assert statuses == [200] * 5
+    assert wait_for(lambda: changes)
+    time.sleep(0.3)
+    # One baseline fetch at start plus one debounced re-fetch
+    assert client.fetches == ['primary', 'primary']
+    assert changes == [('primary', client.events)]
+
+def test_unchanged_events_do_not_trigger_on_change(receiver):
+    manager, client, url, changes = receiver
+    manager.start(['primary'], check_interval=3600)
+    channel = next(iter(manager.channels.values()))
+
+    simulate_notification(url, channel['id'], channel['token'])
+
+    assert wait_for(lambda: len(client.fetches) == 2)
+    time.sleep(0.05)
+    assert changes == []
+
+def test_date_label_rollover_alone_does_not_trigger_on_change(receiver):
+    manager, client, url, changes = receiver
+    manager.start(['primary'], check_interval=3600)
+    channel = next(iter(manager.channels.values()))
+    # Same event version, but midnight has passed since the baseline fetch
+    client.events = [dict(client.events[0], date='Today')]
+
+    simulate_notification(url, channel['id'], channel['token'])
+
+    assert wait_for(lambda: len(client.fetches) == 2)
+    time.sleep(0.05)
+    assert changes == []
+
+def post_raw(url, headers):
+    """POST with headers exactly as given and return the status"""
+    host, port = url.split('//')[1].rstrip('/').split(':')
+    connection = http.client.HTTPConnection(host, int(port))
+    try:
+        connection.putrequest('POST', '/')
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+def test_invalid_content_length_is_rejected(receiver):
+    manager, client, url, changes = receiver
+    channel = manager.watch('primary')
+
+    for length in ('abc', '-5'):
+        assert post_raw(url, {
+            'Content-Length': length,
+            'X-Goog-Channel-ID': channel['id'],
+            'X-Goog-Channel-Token': channel['token'],
+        }) == 400
+
+def test_non_ascii_token_is_rejected(receiver):
+    manager, client, url, changes = receiver
+    channel = manager.watch('primary')
+
+    assert post_raw(url, {
+        'Content-Length': '0',
+        'X-Goog-Channel-ID': channel['id'],
+        'X-Goog-Channel-Token': 'tok\u00e9n',
+    }) == 400
+
+def test_local_channels_accept_known_id_and_token(receiver):
+    manager, client, url, changes = receiver
+    manager.start(['primary'], check_interval=3600, local_token='local')
+
+    assert client.watched == []
+    assert simulate_notification(url, 'local-primary', 'local') == 200
+    assert simulate_notification(url, 'local-primary', 'other') == 403
+
+def test_renew_expiring_replaces_channel_before_stopping_old():
+    client = FakeCalendarClient(expires_in=60)
+    manager = WatchManager(client, 'https://example.com/notify', on_change=lambda *args: None,
+                           renew_margin_seconds=3600)
+    old = manager.watch('primary')
+
+    manager.renew_expiring()
+
+    assert client.watched == ['primary', 'primary']
+    assert client.stopped == [old['resource_id']]
+    assert list(manager.channels) != [old['id']]
+    assert len(manager.channels) == 1
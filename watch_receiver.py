@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+"""
+Push-notification receiver for Google Calendar events.watch channels
+
+Opens a watch channel per calendar, listens for notifications over HTTP
+and re-fetches only the calendar that changed. Bursts of notifications
+are debounced into a single re-fetch, and channels are renewed before
+they expire.
+
+Google only delivers to a public HTTPS address, so in production the
+receiver runs behind a reverse proxy that terminates TLS. For local
+testing, run with --local (known channel IDs and token, no events.watch
+registration) and --dry-run (log digests instead of emailing them), then
+send notifications to it with --simulate.
+"""
+
+import argparse
+import logging
+import secrets
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Token used by --local channels and, by default, by --simulate
+LOCAL_TOKEN = 'local'
+
+class WatchManager:
+    """Tracks watch channels and turns notifications into calendar re-fetches"""
+
+    def __init__(self, client, address: str, on_change: Callable,
+                 debounce_seconds: float = 30, channel_ttl_seconds: int = 7 * 86400,
+                 renew_margin_seconds: int = 3600):
+        """
+        Initialize the manager
+
+        Args:
+            client: CalendarClient used to open channels and re-fetch events
+            address: Public HTTPS URL Google should deliver notifications to
+            on_change: on_change(calendar_id, events) called when a re-fetch
+                finds the next 48 hours different from the previous fetch
+            debounce_seconds: Window in which notifications for one calendar are merged
+            channel_ttl_seconds: Requested channel lifetime
+            renew_margin_seconds: Renew channels this long before they expire
+        """
+        self.client = client
+        self.address = address
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self.channel_ttl_seconds = channel_ttl_seconds
+        self.renew_margin_seconds = renew_margin_seconds
+
+        self.channels = {}  # channel_id -> channel dict
+        self._timers = {}   # calendar_id -> pending re-fetch timer
+        self._last_versions = {}  # calendar_id -> event versions from the latest fetch
+        self._lock = threading.Lock()
+        # API service objects are not thread-safe; timers and renewal share one client
+        self._client_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._renewal_thread = None
+
+    def watch(self, calendar_id: str) -> Dict:
+        """Open a new channel for a calendar and start accepting its notifications"""
+
+        channel_id = str(uuid.uuid4())
+        token = secrets.token_urlsafe(24)
+
+        with self._client_lock:
+            response = self.client.watch_events(
+                address=self.address,
+                channel_id=channel_id,
+                token=token,
+                ttl_seconds=self.channel_ttl_seconds,
+                calendar_id=calendar_id
+            )
+
+        channel = {
+            'id': channel_id,
+            'calendar_id': calendar_id,
+            'token': token,
+            'resource_id': response['resourceId'],
+            'expiration': int(response.get('expiration', 0)) / 1000,
+        }
+        with self._lock:
+            self.channels[channel_id] = channel
+
+        logger.info(f"Watching {calendar_id} on channel {channel_id} until "
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(channel['expiration']))}")
+        return channel
+
+    def register_channel(self, calendar_id: str, channel_id: str, token: str) -> Dict:
+        """
+        Accept notifications for a channel with a known ID and token without
+        calling events.watch. Used for local testing with --simulate.
+        """
+
+        channel = {
+            'id': channel_id,
+            'calendar_id': calendar_id,
+            'token': token,
+            'resource_id': None,
+            'expiration': float('inf'),
+        }
+        with self._lock:
+            self.channels[channel_id] = channel
+
+        logger.info(f"Accepting local notifications for {calendar_id} on channel {channel_id!r} "
+                    f"with token {token!r}")
+        return channel
+
+    def handle_notification(self, headers) -> int:
+        """
+        Process one notification's X-Goog-* headers.
+        Returns the HTTP status code to answer with.
+        """
+
+        channel_id = headers.get('X-Goog-Channel-ID', '')
+        state = headers.get('X-Goog-Resource-State', '')
+
+        with self._lock:
+            channel = self.channels.get(channel_id)
+
+        if channel is None:
+            logger.warning(f"Notification for unknown channel {channel_id!r}")
+            return 404
+
+        token = headers.get('X-Goog-Channel-Token', '')
+        if not token.isascii():
+            # compare_digest only accepts ASCII strings
+            logger.warning(f"Notification with a non-ASCII token for channel {channel_id}")
+            return 400
+
+        if not secrets.compare_digest(token, channel['token']):
+            logger.warning(f"Notification with bad token for channel {channel_id}")
+            return 403
+
+        # 'sync' only confirms that the channel was created
+        if state == 'sync':
+            logger.info(f"Channel {channel_id} confirmed for {channel['calendar_id']}")
+            return 200
+
+        logger.info(f"Change notification ({state}) #{headers.get('X-Goog-Message-Number', '?')} "
+                    f"for {channel['calendar_id']}")
+        self._schedule_refetch(channel['calendar_id'])
+        return 200
+
+    def _schedule_refetch(self, calendar_id: str):
+        """Re-fetch a calendar once its debounce window closes"""
+
+        with self._lock:
+            if calendar_id in self._timers:
+                return  # Already pending; this notification joins that re-fetch
+
+            timer = threading.Timer(self.debounce_seconds, self._refetch, args=(calendar_id,))
+            timer.daemon = True
+            self._timers[calendar_id] = timer
+            timer.start()
+
+    def _refetch(self, calendar_id: str):
+        """Fetch the changed calendar and call on_change if its events differ"""
+
+        with self._lock:
+            self._timers.pop(calendar_id, None)
+
+        try:
+            with self._client_lock:
+                events = self.client.get_events_next_48h(calendar_id)
+        except Exception as e:
+            logger.exception(f"Re-fetch failed for {calendar_id}: {e}")
+            return
+
+        # Notifications cover changes anywhere in the calendar, most of them
+        # outside the 48 hour window, so only report an actual difference
+        versions = _event_versions(events)
+        with self._lock:
+            changed = self._last_versions.get(calendar_id) != versions
+            self._last_versions[calendar_id] = versions
+
+        if not changed:
+            logger.info(f"No changes in the next 48 hours for {calendar_id}")
+            return
+
+        try:
+            self.on_change(calendar_id, events)
+        except Exception as e:
+            logger.exception(f"Change handler failed for {calendar_id}: {e}")
+
+    def _load_baseline(self, calendar_id: str):
+        """Remember the current events so the first notification has something to compare with"""
+
+        try:
+            with self._client_lock:
+                events = self.client.get_events_next_48h(calendar_id)
+        except Exception as e:
+            logger.warning(f"Could not load current events for {calendar_id}: {e}")
+            return
+
+        versions = _event_versions(events)
+        with self._lock:
+            self._last_versions[calendar_id] = versions
+
+    def renew_expiring(self):
+        """Replace channels that expire within the renewal margin"""
+
+        cutoff = time.time() + self.renew_margin_seconds
+        with self._lock:
+            expiring = [c for c in self.channels.values() if c['expiration'] <= cutoff]
+
+        for old in expiring:
+            try:
+                # Open the replacement first so no notifications are missed
+                self.watch(old['calendar_id'])
+            except Exception as e:
+                logger.error(f"Could not renew channel for {old['calendar_id']}: {e}")
+                continue
+            self._stop(old)
+
+    def start(self, calendar_ids: List[str], check_interval: float = 300, local_token: str = None):
+        """
+        Open channels for the calendars and start the renewal thread.
+        With local_token, register channels 'local-<calendar_id>' instead
+        of calling events.watch.
+        """
+
+        for calendar_id in calendar_ids:
+            if local_token:
+                self.register_channel(calendar_id, f"local-{calendar_id}", local_token)
+            else:
+                self.watch(calendar_id)
+            self._load_baseline(calendar_id)
+
+        def renew_loop():
+            while not self._stopped.wait(check_interval):
+                self.renew_expiring()
+
+        self._renewal_thread = threading.Thread(target=renew_loop, name='channel-renewal', daemon=True)
+        self._renewal_thread.start()
+
+    def stop(self):
+        """Stop renewal, cancel pending re-fetches and close all channels"""
+
+        self._stopped.set()
+        with self._lock:
+            timers = list(self._timers.values())
+            self._timers.clear()
+            channels = list(self.channels.values())
+        for timer in timers:
+            timer.cancel()
+        for channel in channels:
+            self._stop(channel)
+
+    def _stop(self, channel: Dict):
+        """Close one channel and forget it"""
+
+        with self._lock:
+            self.channels.pop(channel['id'], None)
+        if channel['resource_id'] is None:
+            return  # Local channel, nothing registered with Google
+        try:
+            with self._client_lock:
+                self.client.stop_channel(channel['id'], channel['resource_id'])
+        except Exception as e:
+            logger.warning(f"Could not stop channel {channel['id']}: {e}")
+
+def _event_versions(events: List[Dict]) -> List:
+    """
+    (id, etag) of each event. The etag changes whenever Google stores an
+    edit, while formatted fields such as the 'Today' date label change on
+    their own as time passes, so only the versions are compared.
+    """
+    return [(event.get('id'), event.get('etag')) for event in events]
+
+def make_server(manager: WatchManager, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """Create an HTTP server that passes notifications to the manager"""
+
+    class NotificationHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # The body can't be drained, so the connection can't be reused either
+                self.close_connection = True
+                status = 400
+            else:
+                # Notifications have no meaningful body, but drain it anyway
+                if length:
+                    self.rfile.read(length)
+                status = manager.handle_notification(self.headers)
+
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return ThreadingHTTPServer((host, port), NotificationHandler)
+
+def simulate_notification(url: str, channel_id: str, token: str, resource_id: str = 'simulated',
+                          state: str = 'exists', message_number: int = 1) -> int:
+    """Send a Google-style push notification to a receiver and return its status"""
+
+    request = urllib.request.Request(url, data=b'', method='POST', headers={
+        'X-Goog-Channel-ID': channel_id,
+        'X-Goog-Channel-Token': token,
+        'X-Goog-Resource-ID': resource_id,
+        'X-Goog-Resource-State': state,
+        'X-Goog-Message-Number': str(message_number),
+    })
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def send_change_digest(config, job: Dict, events: List[Dict], rate_limiter=None, dry_run: bool = False):
+    """Email a 'schedule changed' digest for one calendar/recipient job"""
+
+    from email_template import generate_calendar_email
+    from email_sender import EmailSender
+
+    email_content = generate_calendar_email(events=events, recipient_name=job.get('name'))
+    subject = f"Schedule changed - {email_content['subject']}"
+
+    if dry_run:
+        logger.info(f"[dry run] Would send to {job['recipient']}: {subject}")
+        return
+
+    sender = EmailSender(
+        smtp_user=config.SMTP_USER,
+        smtp_password=config.SMTP_PASSWORD,
+        rate_limiter=rate_limiter
+    )
+    sender.send_email(
+        to_email=job['recipient'],
+        subject=subject,
+        html_body=email_content['html'],
+        text_body=email_content['text']
+    )
+
+def serve(local_token: str = None, dry_run: bool = False):
+    """
+    Watch every configured calendar and serve notifications until interrupted
+
+    Args:
+        local_token: Register local channels with this token instead of calling events.watch
+        dry_run: Log change digests instead of emailing them
+    """
+
+    from send_daily_email import setup_logging
+    from config import Config
+    from calendar_client import CalendarClient
+    from attendee_resolver import AttendeeResolver
+    from rate_limiter import RateLimiter
+
+    setup_logging()
+    config = Config()
+    # A dry run never emails, so it works without SMTP credentials
+    config.validate(require_smtp=not dry_run)
+    if not local_token and not config.WEBHOOK_ADDRESS:
+        raise ValueError("WEBHOOK_ADDRESS not set in .env")
+
+    # A calendar can have several recipients; it still gets a single channel
+    jobs_by_calendar = {}
+    for job in config.digest_jobs():
+        jobs_by_calendar.setdefault(job['calendar_id'], []).append(job)
+
+    rate_limiter = RateLimiter.from_config(config)
+    attendee_resolver = AttendeeResolver.from_config(config)
+
+    client = CalendarClient(
+        credentials_path=config.GOOGLE_CREDENTIALS,
+        token_path=config.GOOGLE_TOKEN,
+        calendar_id=config.CALENDAR_ID,
+        timezone=config.TIMEZONE,
+        attendee_resolver=attendee_resolver,
+        rate_limiter=rate_limiter
+    )
+
+    def on_change(calendar_id, events):
+        logger.info(f"{calendar_id} changed, {len(events)} event(s) in the next 48 hours")
+        attendee_resolver.save()
+        for job in jobs_by_calendar[calendar_id]:
+            send_change_digest(config, job, events, rate_limiter, dry_run)
+
+    manager = WatchManager(
+        client,
+        address=config.WEBHOOK_ADDRESS,
+        on_change=on_change,
+        debounce_seconds=config.WEBHOOK_DEBOUNCE_SECONDS,
+        channel_ttl_seconds=config.WATCH_CHANNEL_TTL
+    )
+    server = make_server(manager, config.WEBHOOK_HOST, config.WEBHOOK_PORT)
+
+    manager.start(list(jobs_by_calendar), local_token=local_token)
+    logger.info(f"Listening for notifications on {config.WEBHOOK_HOST}:{config.WEBHOOK_PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        manager.stop()
+        attendee_resolver.save()
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Receive Google Calendar push notifications")
+    parser.add_argument('--simulate', metavar='URL', help="Send a simulated notification to URL and exit")
+    parser.add_argument('--channel-id', help="Channel ID for --simulate, e.g. local-primary")
+    parser.add_argument('--token', default=LOCAL_TOKEN,
+                        help=f"Channel token for --simulate and --local (default: {LOCAL_TOKEN})")
+    parser.add_argument('--state', default='exists', help="Resource state for --simulate (default: exists)")
+    parser.add_argument('--count', type=int, default=1, help="Notifications to send for --simulate (default: 1)")
+    parser.add_argument('--local', action='store_true',
+                        help="Accept channels local-<calendar_id> without calling events.watch")
+    parser.add_argument('--dry-run', action='store_true', help="Log change digests instead of emailing them")
+    args = parser.parse_args()
+    if args.simulate and not args.channel_id:
+        parser.error("--simulate requires --channel-id")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.simulate:
+        for n in range(1, args.count + 1):
+            status = simulate_notification(args.simulate, args.channel_id, args.token,
+                                           state=args.state, message_number=n)
+            print(f"Notification {n}: HTTP {status}")
+        sys.exit(0)
+    serve(local_token=args.token if args.local else None, dry_run=args.dry_run)